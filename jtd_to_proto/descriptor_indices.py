@@ -0,0 +1,37 @@
+"""
+Read-optimized indices over descriptor containers
+"""
+
+# Standard
+from typing import Dict
+import functools
+
+# Third Party
+from google.protobuf import descriptor as _descriptor
+
+
+@functools.lru_cache(maxsize=None)
+def nested_by_name(
+    descriptor: _descriptor.Descriptor,
+) -> Dict[str, _descriptor.Descriptor]:
+    """Get a name -> descriptor index of a message's nested message types.
+
+    The underlying descriptor.nested_types container only supports linear
+    scans, so looking nested types up by name pays an O(N) walk plus a dict
+    allocation on every call. Descriptors are immutable once registered with a
+    pool, which makes the index safe to memoize.
+
+    NOTE: The cache holds strong references to its descriptors. Descriptors
+        live as long as their pool does, so this does not extend any lifetimes
+        in practice. A WeakKeyDictionary would be preferable, but the upb
+        descriptor types do not support weak references.
+
+    Args:
+        descriptor:  descriptor.Descriptor
+            The message descriptor whose nested types should be indexed
+
+    Returns:
+        nested_types:  Dict[str, descriptor.Descriptor]
+            Mapping from nested type name to its descriptor
+    """
+    return {nested.name: nested for nested in descriptor.nested_types}
@@ -101,10 +101,13 @@ def json_to_service(
         output_descriptor = descriptor_pool.FindMessageTypeByName(rpc_output_type)
 
         method_descriptor_protos.append(
+            # NOTE: The leading "." marks the type names as fully-qualified.
+            #   This matches how the pool normalizes them so that re-adding an
+            #   identical service definition compares equal to the existing file
             descriptor_pb2.MethodDescriptorProto(
                 name=rpc_def["name"],
-                input_type=input_descriptor.full_name,
-                output_type=output_descriptor.full_name,
+                input_type=f".{input_descriptor.full_name}",
+                output_type=f".{output_descriptor.full_name}",
             )
         )
         imports.append(input_descriptor.file.name)
@@ -117,7 +120,7 @@ def json_to_service(
     )
 
     fd_proto = descriptor_pb2.FileDescriptorProto(
-        name=f"{name.lower()}.proto",
+        name=f"{package}.{name.lower()}.proto" if package else f"{name.lower()}.proto",
         package=package,
         syntax="proto3",
         dependency=imports,
@@ -127,7 +130,17 @@ def json_to_service(
 
     # Add the FileDescriptorProto to the Descriptor Pool
     log.debug("Adding Descriptors to DescriptorPool")
-    descriptor_pool.Add(fd_proto)
+    try:
+        existing_fd = descriptor_pool.FindFileByName(fd_proto.name)
+        # Raise if the file exists already with different content
+        # Otherwise, do not attempt to re-add the file
+        if existing_fd.serialized_pb != fd_proto.SerializeToString():
+            raise ValueError(
+                f"Cannot add new file {fd_proto.name} to descriptor pool, file already exists with different content"
+            )
+    except KeyError:
+        # It's okay for the file to not already exist, we'll add it!
+        descriptor_pool.Add(fd_proto)
 
     # Return the descriptor for the top-level message
     fullname = name if not package else ".".join([package, name])
@@ -226,6 +239,10 @@ def service_descriptor_to_server_registration_function(
 
 @dataclasses.dataclass
 class _RPCMethod:
+    # NOTE: Declared by hand since dataclass(slots=True) requires Python 3.10.
+    #   Slots drop the per-instance __dict__ and speed up attribute access.
+    __slots__ = ("name", "fullname", "input_message_class", "output_message_class")
+
     name: str
     fullname: str
     input_message_class: Type[message.Message]
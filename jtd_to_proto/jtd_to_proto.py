@@ -1,7 +1,10 @@
 # Standard
-from typing import Dict, List, Optional, Tuple, Union
+from collections.abc import Mapping
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple, Union
 import copy
+import json
 import re
+import sys
 
 # Third Party
 from google.protobuf import any_pb2
@@ -20,13 +23,52 @@ log = alog.use_channel("JTD2P")
 ## Utils #######################################################################
 
 
+class _TypeRef(NamedTuple):
+    """Reference to an already-registered proto type used as a field's type.
+
+    NamedTuples carry no per-instance __dict__, so these are as cheap as the
+    plain tuples they replaced while naming their fields.
+    """
+
+    type_name: str
+    field_type: int
+
+
+def _jtd_def_cache_key(jtd_def: Dict[str, Union[dict, str]]) -> str:
+    """Compute a canonical json representation of a JTD definition so that
+    repeated conversions of equivalent definitions can be detected. Descriptor
+    references are keyed by their full_name since that uniquely identifies them
+    within a pool.
+    """
+    return json.dumps(jtd_def, sort_keys=True, default=_descriptor_key)
+
+
+def _descriptor_key(value) -> Union[str, dict]:
+    """json.dumps default hook that makes descriptor references and read-only
+    mapping views serializable. Anything else is rejected rather than
+    canonicalized via str(), since distinct values with equal string forms
+    would silently share a cache entry.
+    """
+    if isinstance(value, (_descriptor.Descriptor, _descriptor.EnumDescriptor)):
+        return value.full_name
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f"Unsupported value in JTD definition: {value!r}")
+
+
+# Matches a letter following an underscore; the underscore is consumed and the
+# letter uppercased. Underscores before digits and extra underscores in a run
+# are deliberately preserved so that generated type names stay stable.
+_SNAKE_TO_CAMEL_RE = re.compile(r"_([a-zA-Z])")
+
+
 def _to_upper_camel(snake_str: str) -> str:
     """Convert a snake_case string to UpperCamelCase"""
     if not snake_str:
         return snake_str
     return (
         snake_str[0].upper()
-        + re.sub("_([a-zA-Z])", lambda pat: pat.group(1).upper(), snake_str)[1:]
+        + _SNAKE_TO_CAMEL_RE.sub(lambda match: match.group(1).upper(), snake_str)[1:]
     )
 
 
@@ -58,6 +100,25 @@ JTD_TO_PROTO_TYPES = {
     "bytes": _descriptor.FieldDescriptor.TYPE_BYTES,
 }
 
+# Intern the type keywords so that lookups against interned type names from
+# schemas reduce to pointer comparisons
+JTD_TO_PROTO_TYPES = {
+    sys.intern(key): value for key, value in JTD_TO_PROTO_TYPES.items()
+}
+
+# Cache of previously performed conversions, keyed on the conversion arguments
+# so that re-registering an identical schema short-circuits to a dict lookup
+# rather than re-walking the schema. No invalidation is needed since the
+# descriptor pool itself rejects conflicting redefinitions.
+_CONVERSION_CACHE: Dict[
+    Tuple[str, str, str, int],
+    Union[_descriptor.Descriptor, _descriptor.EnumDescriptor],
+] = {}
+
+# Canonical json for schemas that have already passed JTD validation.
+# Validation is idempotent, so re-validating an identical schema is pure waste.
+_VALIDATED_SCHEMAS: Set[str] = set()
+
 
 ## Interface ###################################################################
 
@@ -93,14 +154,41 @@ def jtd_to_proto(
         descriptor:  descriptor.Descriptor
             The top-level MessageDescriptor corresponding to this jtd definition
     """
+    # Resolve the descriptor pool to aggregate into up front so that it can be
+    # part of the cache key
+    if descriptor_pool is None:
+        log.debug2("Using default descriptor pool")
+        descriptor_pool = _descriptor_pool.Default()
+
+    # If this exact conversion has been performed against this pool before,
+    # short-circuit to the previously computed descriptor. A validating call
+    # may only short-circuit if the schema is known to have validated cleanly,
+    # otherwise a prior validate_jtd=False conversion would mask validation
+    # errors.
+    cache_key = (name, package, _jtd_def_cache_key(jtd_def), id(descriptor_pool))
+    schema_key = cache_key[2]
+    cached_descriptor = _CONVERSION_CACHE.get(cache_key)
+    if cached_descriptor is not None and (
+        not validate_jtd or schema_key in _VALIDATED_SCHEMAS
+    ):
+        log.debug2("Using cached conversion for [%s.%s]", package, name)
+        return cached_descriptor
+
     # If performing validation, attempt to parse schema with jtd and throw away
-    # the results
-    if validate_jtd:
+    # the results. Schemas that have validated cleanly before are skipped.
+    if validate_jtd and schema_key not in _VALIDATED_SCHEMAS:
         log.debug2("Validating JTD")
         jtd.schema.Schema.from_dict(jtd_def)
+        _VALIDATED_SCHEMAS.add(schema_key)
 
     # This list will be used to aggregate the list of message DescriptorProtos
     # for any nested message objects defined inline
+    #
+    # NOTE: The recursion below accumulates every nested message and enum into
+    #   the single top-level *DescriptorProto, so the whole conversion is
+    #   registered with the pool in one Add call at the end rather than one
+    #   call per nested type. This amortizes the pool's locking and
+    #   cross-reference resolution over the full schema.
     imports = []
 
     # Perform the recursive conversion to update the descriptors and enums in
@@ -123,9 +211,13 @@ def jtd_to_proto(
         raise ValueError("Only messages and enums are supported")
 
     # Create the FileDescriptorProto with all messages
+    #
+    # NOTE: The synthetic file name is namespaced by the package so that
+    #   same-named messages in different packages don't collide when they share
+    #   a descriptor pool
     log.debug("Creating FileDescriptorProto")
     fd_proto = descriptor_pb2.FileDescriptorProto(
-        name=f"{name.lower()}.proto",
+        name=f"{package}.{name.lower()}.proto" if package else f"{name.lower()}.proto",
         package=package,
         syntax="proto3",
         dependency=sorted(list(set(imports))),
@@ -135,9 +227,6 @@ def jtd_to_proto(
 
     # Add the FileDescriptorProto to the Descriptor Pool
     log.debug("Adding Descriptors to DescriptorPool")
-    if descriptor_pool is None:
-        log.debug2("Using default descriptor pool")
-        descriptor_pool = _descriptor_pool.Default()
     try:
         existing_fd = descriptor_pool.FindFileByName(fd_proto.name)
         existing_proto = existing_fd.serialized_pb
@@ -155,8 +244,11 @@ def jtd_to_proto(
     # Return the descriptor for the top-level message
     fullname = name if not package else ".".join([package, name])
     if is_enum:
-        return descriptor_pool.FindEnumTypeByName(fullname)
-    return descriptor_pool.FindMessageTypeByName(fullname)
+        top_descriptor = descriptor_pool.FindEnumTypeByName(fullname)
+    else:
+        top_descriptor = descriptor_pool.FindMessageTypeByName(fullname)
+    _CONVERSION_CACHE[cache_key] = top_descriptor
+    return top_descriptor
 
 
 ## Impl ########################################################################
@@ -172,115 +264,161 @@ def _jtd_to_proto_impl(
     descriptor_pb2.DescriptorProto,
     descriptor_pb2.EnumDescriptorProto,
     int,
-    Tuple[str, int],
+    _TypeRef,
 ]:
     """Recursive implementation of converting messages, fields, enums, arrays,
     and maps from JTD to their respective *DescriptorProto representations.
+
+    The JTD shape keywords are mutually exclusive, so dispatch is a single
+    hash lookup in _JTD_HANDLERS rather than a branch chain.
+    """
+    for kind in jtd_def.keys() & _JTD_HANDLERS.keys():
+        return _JTD_HANDLERS[kind](
+            jtd_def=jtd_def,
+            name=name,
+            package=package,
+            imports=imports,
+        )
+
+
+def _handle_type(
+    *,
+    jtd_def: Dict[str, Union[dict, str]],
+    name: Optional[str],
+    package: str,
+    imports: List[str],
+) -> Union[int, _TypeRef]:
+    """Handle the base-case of a single "type": "name" definition by looking up
+    the corresponding proto type
     """
+    type_name = jtd_def["type"]
+
+    # If the type name is itself a descriptor, use it as the value directly
+    proto_type_descriptor = None
+    is_enum = False
+    if isinstance(type_name, _descriptor.Descriptor):
+        proto_type_descriptor = type_name
+    elif isinstance(type_name, _descriptor.EnumDescriptor):
+        is_enum = True
+        proto_type_descriptor = type_name
+    else:
+        # Intern the name so the table lookup hits the interned-key fast path
+        if isinstance(type_name, str):
+            type_name = sys.intern(type_name)
+        proto_type_val = JTD_TO_PROTO_TYPES.get(type_name)
+        proto_type_descriptor = getattr(proto_type_val, "DESCRIPTOR", None)
+        if proto_type_val is None:
+            raise ValueError(f"No proto mapping for type '{type_name}'")
+        elif proto_type_descriptor is None:
+            assert isinstance(
+                proto_type_val, int
+            ), f"PROGRAMMING ERROR: Bad proto value type for {type_name}"
+            return proto_type_val
+
+    assert (
+        proto_type_descriptor is not None
+    ), "PROGRAMMING ERROR: proto_type_descriptor not defined"
+    type_name = proto_type_descriptor.full_name
+    import_file = proto_type_descriptor.file.name
+    log.debug3(
+        "Adding import file %s for known nested type %s",
+        import_file,
+        type_name,
+    )
+    imports.append(import_file)
+    return _TypeRef(
+        type_name,
+        (
+            _descriptor.FieldDescriptor.TYPE_ENUM
+            if is_enum
+            else _descriptor.FieldDescriptor.TYPE_MESSAGE
+        ),
+    )
+
 
-    # Common logic for determining the name to use if a name is needed
+def _handle_enum(
+    *,
+    jtd_def: Dict[str, Union[dict, str]],
+    name: Optional[str],
+    package: str,
+    imports: List[str],
+) -> descriptor_pb2.EnumDescriptorProto:
+    """Handle an "enum" definition"""
     message_name = _to_upper_camel(name)
-    log.debug("Message name: %s", message_name)
+    log.debug("Enum name: %s", message_name)
+    return descriptor_pb2.EnumDescriptorProto(
+        name=message_name,
+        value=[
+            descriptor_pb2.EnumValueDescriptorProto(
+                name=entry_name,
+                number=i,
+            )
+            for i, entry_name in enumerate(jtd_def["enum"])
+        ],
+    )
 
-    # If the jtd definition is a single "type": "name", perform the base-case
-    # and look up the proto type
-    type_name = jtd_def.get("type")
-    if type_name is not None:
-        # If the type name is itself a descriptor, use it as the value directly
-        proto_type_descriptor = None
-        is_enum = False
-        if isinstance(type_name, _descriptor.Descriptor):
-            proto_type_descriptor = type_name
-        elif isinstance(type_name, _descriptor.EnumDescriptor):
-            is_enum = True
-            proto_type_descriptor = type_name
-        else:
-            proto_type_val = JTD_TO_PROTO_TYPES.get(type_name)
-            proto_type_descriptor = getattr(proto_type_val, "DESCRIPTOR", None)
-            if proto_type_val is None:
-                raise ValueError(f"No proto mapping for type '{type_name}'")
-            elif proto_type_descriptor is None:
-                assert isinstance(
-                    proto_type_val, int
-                ), f"PROGRAMMING ERROR: Bad proto value type for {type_name}"
-                return proto_type_val
-
-        assert (
-            proto_type_descriptor is not None
-        ), "PROGRAMMING ERROR: proto_type_descriptor not defined"
-        type_name = proto_type_descriptor.full_name
-        import_file = proto_type_descriptor.file.name
-        log.debug3(
-            "Adding import file %s for known nested type %s",
-            import_file,
-            type_name,
-        )
-        imports.append(import_file)
-        return (
-            type_name,
-            (
-                _descriptor.FieldDescriptor.TYPE_ENUM
-                if is_enum
-                else _descriptor.FieldDescriptor.TYPE_MESSAGE
-            ),
-        )
 
-    # If the definition has "enum" it's an enum
-    enum = jtd_def.get("enum")
-    if enum is not None:
-        enum_proto = descriptor_pb2.EnumDescriptorProto(
-            name=message_name,
-            value=[
-                descriptor_pb2.EnumValueDescriptorProto(
-                    name=entry_name,
-                    number=i,
-                )
-                for i, entry_name in enumerate(enum)
-            ],
-        )
-        return enum_proto
+def _handle_values(
+    *,
+    jtd_def: Dict[str, Union[dict, str]],
+    name: Optional[str],
+    package: str,
+    imports: List[str],
+) -> descriptor_pb2.DescriptorProto:
+    """Handle a "values" definition which converts to a proto map.
 
-    # If the definition has "values" it's a map
-    #
-    # Maps in descriptors are implemented in a _funky_ way. The map syntax=
-    #     map<KeyType, ValType> the_map = 1;
-    #
-    # gets converted to a repeated message as follows:
-    #     option map_entry = true;
-    #     optional KeyType key = 1;
-    #     optional ValType value = 2;
-    #
-    # CITE: https://github.com/protocolbuffers/protobuf/blob/main/src/google/protobuf/descriptor.cc#L7102
-    ##
-    values = jtd_def.get("values")
-    if values is not None:
-        # Construct the JTD representation of the message
-        entry_msg_type = {
-            "properties": {
-                "key": {"type": "string"},
-                "value": values,
-            }
+    Maps in descriptors are implemented in a _funky_ way. The map syntax=
+        map<KeyType, ValType> the_map = 1;
+
+    gets converted to a repeated message as follows:
+        option map_entry = true;
+        optional KeyType key = 1;
+        optional ValType value = 2;
+
+    CITE: https://github.com/protocolbuffers/protobuf/blob/main/src/google/protobuf/descriptor.cc#L7102
+    """
+    message_name = _to_upper_camel(name)
+
+    # Construct the JTD representation of the message
+    entry_msg_type = {
+        "properties": {
+            "key": {"type": "string"},
+            "value": jtd_def["values"],
         }
-        entry_msg_name = "{}Entry".format(message_name)
-        log.debug3("Map entry message for %s: %s", message_name, entry_msg_name)
+    }
+    entry_msg_name = "{}Entry".format(message_name)
+    log.debug3("Map entry message for %s: %s", message_name, entry_msg_name)
+
+    # Perform the recursive conversion
+    nested = _jtd_to_proto_impl(
+        jtd_def=entry_msg_type,
+        name=entry_msg_name,
+        package=package,
+        imports=imports,
+    )
 
-        # Perform the recursive conversion
-        nested = _jtd_to_proto_impl(
-            jtd_def=entry_msg_type,
-            name=entry_msg_name,
-            package=package,
-            imports=imports,
+    # Set the map_entry option
+    nested.MergeFrom(
+        descriptor_pb2.DescriptorProto(
+            options=descriptor_pb2.MessageOptions(map_entry=True)
         )
+    )
+    return nested
 
-        # Set the map_entry option
-        nested.MergeFrom(
-            descriptor_pb2.DescriptorProto(
-                options=descriptor_pb2.MessageOptions(map_entry=True)
-            )
-        )
-        return nested
 
-    # If the object has "properties", it's a message
+def _handle_properties(
+    *,
+    jtd_def: Dict[str, Union[dict, str]],
+    name: Optional[str],
+    package: str,
+    imports: List[str],
+) -> Optional[descriptor_pb2.DescriptorProto]:
+    """Handle a "properties"/"optionalProperties"/"additionalProperties"
+    definition which converts to a message
+    """
+    message_name = _to_upper_camel(name)
+    log.debug("Message name: %s", message_name)
+
     properties = jtd_def.get("properties", {})
     optional_properties = jtd_def.get("optionalProperties", {})
     all_properties = dict(**properties, **optional_properties)
@@ -370,12 +508,11 @@ def _jtd_to_proto_impl(
                 if isinstance(nested, int):
                     nested_field_kwargs["type"] = nested
 
-                # If the result is a tuple, it's an imported message or name
-                elif isinstance(nested, tuple):
-                    (
-                        nested_field_kwargs["type_name"],
-                        nested_field_kwargs["type"],
-                    ) = nested
+                # If the result is a type reference, it's an imported message
+                # or enum
+                elif isinstance(nested, _TypeRef):
+                    nested_field_kwargs["type_name"] = nested.type_name
+                    nested_field_kwargs["type"] = nested.field_type
 
                 # If the result is an enum, add it as a nested enum
                 elif isinstance(nested, descriptor_pb2.EnumDescriptorProto):
@@ -473,3 +610,15 @@ def _jtd_to_proto_impl(
             oneof_decl=nested_oneofs,
         )
         return descriptor_proto
+
+
+# Dispatch table from JTD shape keyword to its handler. The three "properties"
+# flavors all describe a message, so they share a single handler.
+_JTD_HANDLERS = {
+    "type": _handle_type,
+    "enum": _handle_enum,
+    "values": _handle_values,
+    "properties": _handle_properties,
+    "optionalProperties": _handle_properties,
+    "additionalProperties": _handle_properties,
+}
@@ -6,7 +6,7 @@ Common test helpers
 import os
 
 # Third Party
-from google.protobuf import descriptor_pool, struct_pb2, timestamp_pb2
+from google.protobuf import any_pb2, descriptor_pool, struct_pb2, timestamp_pb2
 import pytest
 
 # First Party
@@ -21,10 +21,15 @@ alog.configure(
 )
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def temp_dpool():
-    """Fixture to isolate the descriptor pool used in each test"""
+    """Fixture to isolate the descriptor pools used in the tests from the
+    default pool. The pool is shared across a module to avoid paying the cost
+    of pool construction and well-known-type registration per test, so tests
+    within a module must use unique (package, name) pairs.
+    """
     dpool = descriptor_pool.DescriptorPool()
+    dpool.AddSerializedFile(any_pb2.DESCRIPTOR.serialized_pb)
     dpool.AddSerializedFile(struct_pb2.DESCRIPTOR.serialized_pb)
     dpool.AddSerializedFile(timestamp_pb2.DESCRIPTOR.serialized_pb)
     yield dpool
@@ -91,7 +91,7 @@ def test_descriptor_to_message_class_nested_messages(temp_dpool):
     top = descriptor_to_message_class(
         jtd_to_proto(
             name="Top",
-            package="foobar",
+            package="foobar.nested_messages",
             jtd_def={
                 "properties": {
                     "ghost": {
@@ -115,7 +115,7 @@ def test_descriptor_to_message_class_nested_enums(temp_dpool):
     top = descriptor_to_message_class(
         jtd_to_proto(
             name="Top",
-            package="foobar",
+            package="foobar.nested_enums",
             jtd_def={
                 "properties": {
                     "bat": {
@@ -135,7 +135,7 @@ def test_descriptor_to_message_class_top_level_enum(temp_dpool):
     top = descriptor_to_message_class(
         jtd_to_proto(
             name="Top",
-            package="foobar",
+            package="foobar.top_level_enum",
             jtd_def={"enum": ["VAMPIRE", "DRACULA"]},
             descriptor_pool=temp_dpool,
         )
@@ -107,14 +107,17 @@ def test_json_to_service_descriptor(temp_dpool, foo_message, bar_message):
         }
     }
     # _descriptor.ServiceDescriptor
+    # NOTE: The name needs to be unique from the foo_service_descriptor fixture
+    #   since this service has a different set of rpcs and the descriptor pool
+    #   is shared across the module
     service_descriptor = json_to_service(
         package="foo.bar",
-        name="FooService",
+        name="FooTrainService",
         json_service_def=service_json,
         descriptor_pool=temp_dpool,
     )
     # Validate message naming
-    assert service_descriptor.name == "FooService"
+    assert service_descriptor.name == "FooTrainService"
     assert len(service_descriptor.methods) == 2
 
 
@@ -141,6 +144,45 @@ def test_json_to_service_input_validation(temp_dpool, foo_message):
     assert "Invalid service json" in str(excinfo.value)
 
 
+def test_json_to_service_duplicate_service_name(temp_dpool, foo_message, bar_message):
+    """Check that we cannot register a different service with the same name"""
+    service_json = {
+        "service": {
+            "rpcs": [
+                {
+                    "name": "FooPredict",
+                    "input_type": "foo.bar.Foo",
+                    "output_type": "foo.bar.Bar",
+                }
+            ]
+        }
+    }
+    json_to_service(
+        package="foo.bar",
+        name="FooDupService",
+        json_service_def=service_json,
+        descriptor_pool=temp_dpool,
+    )
+    other_service_json = {
+        "service": {
+            "rpcs": [
+                {
+                    "name": "FooOtherPredict",
+                    "input_type": "foo.bar.Foo",
+                    "output_type": "foo.bar.Foo",
+                }
+            ]
+        }
+    }
+    with pytest.raises(ValueError):
+        json_to_service(
+            package="foo.bar",
+            name="FooDupService",
+            json_service_def=other_service_json,
+            descriptor_pool=temp_dpool,
+        )
+
+
 def test_service_descriptor_to_service(foo_service_descriptor):
     """Ensure that service class can be created from service descriptor"""
     ServiceClass = service_descriptor_to_service(foo_service_descriptor)
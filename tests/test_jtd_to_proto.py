@@ -2,59 +2,55 @@
 Tests for the jtd_to_proto logic
 """
 
+# Standard
+from types import MappingProxyType
+
 # Third Party
-from google.protobuf import any_pb2
 from google.protobuf import descriptor_pool as _descriptor_pool
 from google.protobuf.descriptor import EnumDescriptor, FieldDescriptor
 import pytest
 
 # Local
+from jtd_to_proto.descriptor_indices import nested_by_name
 from jtd_to_proto.json_to_service import json_to_service
 from jtd_to_proto.jtd_to_proto import _to_upper_camel, jtd_to_proto
 
-## Happy Path ##################################################################
+## Shared Schemas ##############################################################
+
+# Read-only constants for schema shapes that are reused across tests so that
+# the dicts are only allocated once at import time
+_BOOL_PROPS_SCHEMA = MappingProxyType(
+    {
+        "properties": {
+            "foo": {
+                "type": "boolean",
+            },
+        }
+    }
+)
+_FOO_BAR_ENUM_SCHEMA = MappingProxyType({"enum": ["FOO", "BAR"]})
 
+## Happy Path ##################################################################
 
-def test_jtd_to_proto_primitives(temp_dpool):
-    """Ensure that primitives in JTD can be converted"""
-    msg_name = "Foo"
-    package = "foo.bar"
-    descriptor = jtd_to_proto(
-        msg_name,
-        package,
+# Case table for the JTD shapes that all follow the same "validate naming /
+# nested descriptors / fields" pattern. Each case is
+# (msg_name, package, schema, expected) where expected describes the nested
+# types, nested enums, oneofs, and fields the conversion should produce.
+# Field specs name the expected type/label constants and may also pin the
+# field's message type full_name or containing oneof.
+_DESCRIPTOR_CASES = [
+    pytest.param(
+        "Foo",
+        "foo.bar.primitives",
+        _BOOL_PROPS_SCHEMA,
         {
-            "properties": {
-                "foo": {
-                    "type": "boolean",
-                },
-            }
+            "fields": {"foo": {"type": "TYPE_BOOL"}},
         },
-        descriptor_pool=temp_dpool,
-        validate_jtd=True,
-    )
-    # Validate message naming
-    assert descriptor.name == msg_name
-    assert descriptor.full_name == ".".join([package, msg_name])
-
-    # Validate nested descriptors
-    assert not descriptor.nested_types
-    assert not descriptor.enum_types
-    assert not descriptor.oneofs
-
-    # Validate fields
-    fields = dict(descriptor.fields_by_name)
-    assert list(fields.keys()) == ["foo"]
-    assert fields["foo"].type == fields["foo"].TYPE_BOOL
-    assert fields["foo"].label == fields["foo"].LABEL_OPTIONAL
-
-
-def test_jtd_to_proto_objects(temp_dpool):
-    """Ensure that nested objects can be converted"""
-    msg_name = "Foo"
-    package = "foo.bar"
-    descriptor = jtd_to_proto(
-        msg_name,
-        package,
+        id="primitives",
+    ),
+    pytest.param(
+        "Foo",
+        "foo.bar.objects",
         {
             "properties": {
                 "buz": {
@@ -66,80 +62,15 @@ def test_jtd_to_proto_objects(temp_dpool):
                 },
             },
         },
-        descriptor_pool=temp_dpool,
-        validate_jtd=True,
-    )
-    # Validate message naming
-    assert descriptor.name == msg_name
-    assert descriptor.full_name == ".".join([package, msg_name])
-
-    # Validate nested descriptors
-    assert len(descriptor.nested_types) == 1
-    assert descriptor.nested_types[0].name == "Buz"
-    assert descriptor.nested_types[0].full_name == ".".join([package, msg_name, "Buz"])
-    assert not descriptor.enum_types
-    assert not descriptor.oneofs
-
-    # Validate fields
-    fields = dict(descriptor.fields_by_name)
-    assert list(fields.keys()) == ["buz"]
-    assert fields["buz"].type == fields["buz"].TYPE_MESSAGE
-    assert fields["buz"].label == fields["buz"].LABEL_OPTIONAL
-
-
-def test_jtd_to_proto_additonal_properties(temp_dpool):
-    """Ensure that an object can use 'additionalProperties'"""
-    msg_name = "Foo"
-    package = "foo.bar"
-    descriptor = jtd_to_proto(
-        msg_name,
-        package,
         {
-            "properties": {
-                "buz": {
-                    "additionalProperties": True,
-                },
-            },
+            "nested": ["Buz"],
+            "fields": {"buz": {"type": "TYPE_MESSAGE"}},
         },
-        descriptor_pool=temp_dpool,
-        validate_jtd=True,
-    )
-    # Validate message naming
-    assert descriptor.name == msg_name
-    assert descriptor.full_name == ".".join([package, msg_name])
-
-    # Validate nested descriptors
-    nested_types = list(descriptor.nested_types)
-    assert len(nested_types) == 1
-    assert nested_types[0].name == "Buz"
-    assert nested_types[0].full_name == ".".join([package, msg_name, "Buz"])
-    nested_fields = dict(nested_types[0].fields_by_name)
-    assert list(nested_fields.keys()) == ["additionalProperties"]
-    assert (
-        nested_fields["additionalProperties"].type
-        == nested_fields["additionalProperties"].TYPE_MESSAGE
-    )
-    assert (
-        nested_fields["additionalProperties"].message_type.full_name
-        == "google.protobuf.Struct"
-    )
-    assert not descriptor.enum_types
-    assert not descriptor.oneofs
-
-    # Validate fields
-    fields = dict(descriptor.fields_by_name)
-    assert list(fields.keys()) == ["buz"]
-    assert fields["buz"].type == fields["buz"].TYPE_MESSAGE
-    assert fields["buz"].label == fields["buz"].LABEL_OPTIONAL
-
-
-def test_jtd_to_proto_timestamp(temp_dpool):
-    """Ensure that the timestamp type can be converted"""
-    msg_name = "Foo"
-    package = "foo.bar"
-    descriptor = jtd_to_proto(
-        msg_name,
-        package,
+        id="objects",
+    ),
+    pytest.param(
+        "Foo",
+        "foo.bar.timestamp",
         {
             "properties": {
                 "time": {
@@ -147,33 +78,19 @@ def test_jtd_to_proto_timestamp(temp_dpool):
                 },
             }
         },
-        descriptor_pool=temp_dpool,
-        validate_jtd=True,
-    )
-    # Validate message naming
-    assert descriptor.name == msg_name
-    assert descriptor.full_name == ".".join([package, msg_name])
-
-    # Validate nested descriptors
-    assert not descriptor.nested_types
-    assert not descriptor.enum_types
-    assert not descriptor.oneofs
-
-    # Validate fields
-    fields = dict(descriptor.fields_by_name)
-    assert list(fields.keys()) == ["time"]
-    assert fields["time"].type == fields["time"].TYPE_MESSAGE
-    assert fields["time"].message_type.full_name == "google.protobuf.Timestamp"
-    assert fields["time"].label == fields["time"].LABEL_OPTIONAL
-
-
-def test_jtd_to_proto_enum(temp_dpool):
-    """Ensure that enums can be converted"""
-    msg_name = "Foo"
-    package = "foo.bar"
-    descriptor = jtd_to_proto(
-        msg_name,
-        package,
+        {
+            "fields": {
+                "time": {
+                    "type": "TYPE_MESSAGE",
+                    "message_type": "google.protobuf.Timestamp",
+                },
+            },
+        },
+        id="timestamp",
+    ),
+    pytest.param(
+        "Foo",
+        "foo.bar.enums",
         {
             "properties": {
                 "bat": {
@@ -181,41 +98,15 @@ def test_jtd_to_proto_enum(temp_dpool):
                 },
             }
         },
-        descriptor_pool=temp_dpool,
-        validate_jtd=True,
-    )
-    # Validate message naming
-    assert descriptor.name == msg_name
-    assert descriptor.full_name == ".".join([package, msg_name])
-
-    # Validate nested descriptors
-    assert not descriptor.nested_types
-    enum_types = list(descriptor.enum_types)
-    assert len(enum_types) == 1
-    assert enum_types[0].name == "Bat"
-    assert enum_types[0].full_name == ".".join([package, msg_name, "Bat"])
-    assert {
-        val_name: val.number for val_name, val in enum_types[0].values_by_name.items()
-    } == {
-        "VAMPIRE": 0,
-        "DRACULA": 1,
-    }
-    assert not descriptor.oneofs
-
-    # Validate fields
-    fields = dict(descriptor.fields_by_name)
-    assert list(fields.keys()) == ["bat"]
-    assert fields["bat"].type == fields["bat"].TYPE_ENUM
-    assert fields["bat"].label == fields["bat"].LABEL_OPTIONAL
-
-
-def test_jtd_to_proto_arrays_of_primitives(temp_dpool):
-    """Ensure that arrays of primitives can be converted"""
-    msg_name = "Foo"
-    package = "foo.bar"
-    descriptor = jtd_to_proto(
-        msg_name,
-        package,
+        {
+            "enums": {"Bat": {"VAMPIRE": 0, "DRACULA": 1}},
+            "fields": {"bat": {"type": "TYPE_ENUM"}},
+        },
+        id="enum",
+    ),
+    pytest.param(
+        "Foo",
+        "foo.bar.array_primitives",
         {
             "properties": {
                 "foo": {
@@ -225,32 +116,14 @@ def test_jtd_to_proto_arrays_of_primitives(temp_dpool):
                 },
             }
         },
-        descriptor_pool=temp_dpool,
-        validate_jtd=True,
-    )
-    # Validate message naming
-    assert descriptor.name == msg_name
-    assert descriptor.full_name == ".".join([package, msg_name])
-
-    # Validate nested descriptors
-    assert not descriptor.nested_types
-    assert not descriptor.enum_types
-    assert not descriptor.oneofs
-
-    # Validate fields
-    fields = dict(descriptor.fields_by_name)
-    assert list(fields.keys()) == ["foo"]
-    assert fields["foo"].type == fields["foo"].TYPE_BOOL
-    assert fields["foo"].label == fields["foo"].LABEL_REPEATED
-
-
-def test_jtd_to_proto_arrays_of_objects(temp_dpool):
-    """Ensure that arrays of objects can be converted"""
-    msg_name = "Foo"
-    package = "foo.bar"
-    descriptor = jtd_to_proto(
-        msg_name,
-        package,
+        {
+            "fields": {"foo": {"type": "TYPE_BOOL", "label": "LABEL_REPEATED"}},
+        },
+        id="arrays_of_primitives",
+    ),
+    pytest.param(
+        "Foo",
+        "foo.bar.array_objects",
         {
             "properties": {
                 "buz": {
@@ -264,35 +137,15 @@ def test_jtd_to_proto_arrays_of_objects(temp_dpool):
                 },
             },
         },
-        descriptor_pool=temp_dpool,
-        validate_jtd=True,
-    )
-    # Validate message naming
-    assert descriptor.name == msg_name
-    assert descriptor.full_name == ".".join([package, msg_name])
-
-    # Validate nested descriptors
-    nested_types = list(descriptor.nested_types)
-    assert len(nested_types) == 1
-    assert nested_types[0].name == "Buz"
-    assert nested_types[0].full_name == ".".join([package, msg_name, "Buz"])
-    assert not descriptor.enum_types
-    assert not descriptor.oneofs
-
-    # Validate fields
-    fields = dict(descriptor.fields_by_name)
-    assert list(fields.keys()) == ["buz"]
-    assert fields["buz"].type == fields["buz"].TYPE_MESSAGE
-    assert fields["buz"].label == fields["buz"].LABEL_REPEATED
-
-
-def test_jtd_to_proto_arrays_of_enums(temp_dpool):
-    """Ensure that arrays of enums can be converted"""
-    msg_name = "Foo"
-    package = "foo.bar"
-    descriptor = jtd_to_proto(
-        msg_name,
-        package,
+        {
+            "nested": ["Buz"],
+            "fields": {"buz": {"type": "TYPE_MESSAGE", "label": "LABEL_REPEATED"}},
+        },
+        id="arrays_of_objects",
+    ),
+    pytest.param(
+        "Foo",
+        "foo.bar.array_enums",
         {
             "properties": {
                 "bat": {
@@ -302,41 +155,15 @@ def test_jtd_to_proto_arrays_of_enums(temp_dpool):
                 },
             }
         },
-        descriptor_pool=temp_dpool,
-        validate_jtd=True,
-    )
-    # Validate message naming
-    assert descriptor.name == msg_name
-    assert descriptor.full_name == ".".join([package, msg_name])
-
-    # Validate nested descriptors
-    assert not descriptor.nested_types
-    enum_types = list(descriptor.enum_types)
-    assert len(enum_types) == 1
-    assert enum_types[0].name == "Bat"
-    assert enum_types[0].full_name == ".".join([package, msg_name, "Bat"])
-    assert {
-        val_name: val.number for val_name, val in enum_types[0].values_by_name.items()
-    } == {
-        "VAMPIRE": 0,
-        "DRACULA": 1,
-    }
-    assert not descriptor.oneofs
-
-    # Validate fields
-    fields = dict(descriptor.fields_by_name)
-    assert list(fields.keys()) == ["bat"]
-    assert fields["bat"].type == fields["bat"].TYPE_ENUM
-    assert fields["bat"].label == fields["bat"].LABEL_REPEATED
-
-
-def test_jtd_to_proto_maps_to_primitives(temp_dpool):
-    """Ensure that maps with primitive values can be converted"""
-    msg_name = "Foo"
-    package = "foo.bar"
-    descriptor = jtd_to_proto(
-        msg_name,
-        package,
+        {
+            "enums": {"Bat": {"VAMPIRE": 0, "DRACULA": 1}},
+            "fields": {"bat": {"type": "TYPE_ENUM", "label": "LABEL_REPEATED"}},
+        },
+        id="arrays_of_enums",
+    ),
+    pytest.param(
+        "Foo",
+        "foo.bar.map_primitives",
         {
             "properties": {
                 "biz": {
@@ -346,37 +173,18 @@ def test_jtd_to_proto_maps_to_primitives(temp_dpool):
                 },
             }
         },
-        descriptor_pool=temp_dpool,
-        validate_jtd=True,
-    )
-    # Validate message naming
-    assert descriptor.name == msg_name
-    assert descriptor.full_name == ".".join([package, msg_name])
-
-    # Validate nested descriptors
-    assert len(descriptor.nested_types) == 1
-    assert descriptor.nested_types[0].name == "BizEntry"
-    assert {field.name: field.type for field in descriptor.nested_types[0].fields} == {
-        "key": FieldDescriptor.TYPE_STRING,
-        "value": FieldDescriptor.TYPE_FLOAT,
-    }
-    assert not descriptor.enum_types
-    assert not descriptor.oneofs
-
-    # Validate fields
-    fields = dict(descriptor.fields_by_name)
-    assert list(fields.keys()) == ["biz"]
-    assert fields["biz"].type == fields["biz"].TYPE_MESSAGE
-    assert fields["biz"].label == fields["biz"].LABEL_REPEATED
-
-
-def test_jtd_to_proto_maps_to_objects(temp_dpool):
-    """Ensure that maps with object values can be converted"""
-    msg_name = "SomethingElse"
-    package = "something.else"
-    descriptor = jtd_to_proto(
-        msg_name,
-        package,
+        {
+            "nested": ["BizEntry"],
+            "nested_fields": {
+                "BizEntry": {"key": "TYPE_STRING", "value": "TYPE_FLOAT"},
+            },
+            "fields": {"biz": {"type": "TYPE_MESSAGE", "label": "LABEL_REPEATED"}},
+        },
+        id="maps_to_primitives",
+    ),
+    pytest.param(
+        "SomethingElse",
+        "something.else.map_objects",
         {
             "properties": {
                 "bonk": {
@@ -388,41 +196,19 @@ def test_jtd_to_proto_maps_to_objects(temp_dpool):
                 },
             }
         },
-        descriptor_pool=temp_dpool,
-        validate_jtd=True,
-    )
-    # Validate message naming
-    assert descriptor.name == msg_name
-    assert descriptor.full_name == ".".join([package, msg_name])
-
-    # Validate nested descriptors
-    assert len(descriptor.nested_types) == 2
-    nested_types = {typ.name: typ for typ in descriptor.nested_types}
-    assert list(nested_types.keys()) == ["BonkEntry", "BonkValue"]
-    assert {field.name: field.type for field in nested_types["BonkEntry"].fields} == {
-        "key": FieldDescriptor.TYPE_STRING,
-        "value": FieldDescriptor.TYPE_MESSAGE,
-    }
-    assert {field.name: field.type for field in nested_types["BonkValue"].fields} == {
-        "how_hard": FieldDescriptor.TYPE_FLOAT,
-    }
-    assert not descriptor.enum_types
-    assert not descriptor.oneofs
-
-    # Validate fields
-    fields = dict(descriptor.fields_by_name)
-    assert list(fields.keys()) == ["bonk"]
-    assert fields["bonk"].type == fields["bonk"].TYPE_MESSAGE
-    assert fields["bonk"].label == fields["bonk"].LABEL_REPEATED
-
-
-def test_jtd_to_proto_maps_to_enums(temp_dpool):
-    """Ensure that maps with enum values can be converted"""
-    msg_name = "SomethingElse"
-    package = "something.else"
-    descriptor = jtd_to_proto(
-        msg_name,
-        package,
+        {
+            "nested": ["BonkEntry", "BonkValue"],
+            "nested_fields": {
+                "BonkEntry": {"key": "TYPE_STRING", "value": "TYPE_MESSAGE"},
+                "BonkValue": {"how_hard": "TYPE_FLOAT"},
+            },
+            "fields": {"bonk": {"type": "TYPE_MESSAGE", "label": "LABEL_REPEATED"}},
+        },
+        id="maps_to_objects",
+    ),
+    pytest.param(
+        "SomethingElse",
+        "something.else.map_enums",
         {
             "properties": {
                 "bang": {
@@ -432,45 +218,19 @@ def test_jtd_to_proto_maps_to_enums(temp_dpool):
                 },
             }
         },
-        descriptor_pool=temp_dpool,
-        validate_jtd=True,
-    )
-    # Validate message naming
-    assert descriptor.name == msg_name
-    assert descriptor.full_name == ".".join([package, msg_name])
-
-    # Validate nested descriptors
-    assert len(descriptor.nested_types) == 1
-    assert descriptor.nested_types[0].name == "BangEntry"
-    assert {field.name: field.type for field in descriptor.nested_types[0].fields} == {
-        "key": FieldDescriptor.TYPE_STRING,
-        "value": FieldDescriptor.TYPE_ENUM,
-    }
-    assert len(descriptor.enum_types) == 1
-    assert descriptor.enum_types[0].name == "BangValue"
-    assert {
-        val_name: val.number
-        for val_name, val in descriptor.enum_types[0].values_by_name.items()
-    } == {
-        "BLAM": 0,
-        "KAPOW": 1,
-    }
-    assert not descriptor.oneofs
-
-    # Validate fields
-    fields = dict(descriptor.fields_by_name)
-    assert list(fields.keys()) == ["bang"]
-    assert fields["bang"].type == fields["bang"].TYPE_MESSAGE
-    assert fields["bang"].label == fields["bang"].LABEL_REPEATED
-
-
-def test_jtd_to_proto_oneofs(temp_dpool):
-    """Ensure that oneofs can be converted"""
-    msg_name = "Foo"
-    package = "foo.bar"
-    descriptor = jtd_to_proto(
-        msg_name,
-        package,
+        {
+            "nested": ["BangEntry"],
+            "nested_fields": {
+                "BangEntry": {"key": "TYPE_STRING", "value": "TYPE_ENUM"},
+            },
+            "enums": {"BangValue": {"BLAM": 0, "KAPOW": 1}},
+            "fields": {"bang": {"type": "TYPE_MESSAGE", "label": "LABEL_REPEATED"}},
+        },
+        id="maps_to_enums",
+    ),
+    pytest.param(
+        "Foo",
+        "foo.bar.oneofs",
         {
             "properties": {
                 "bit": {
@@ -490,50 +250,113 @@ def test_jtd_to_proto_oneofs(temp_dpool):
                 },
             }
         },
-        descriptor_pool=temp_dpool,
-        validate_jtd=True,
-    )
+        {
+            "nested": ["SCREWDRIVER", "DRILL"],
+            "oneofs": ["bitType"],
+            "fields": {
+                "screw_driver": {"type": "TYPE_MESSAGE", "oneof": "bitType"},
+                "drill": {"type": "TYPE_MESSAGE", "oneof": "bitType"},
+            },
+        },
+        id="oneofs",
+    ),
+    pytest.param(
+        "Foo",
+        "foo.bar.optional_props",
+        {
+            "properties": {
+                "foo": {
+                    "type": "boolean",
+                },
+            },
+            "optionalProperties": {
+                "metoo": {
+                    "type": "string",
+                }
+            },
+        },
+        {
+            "fields": {
+                "foo": {"type": "TYPE_BOOL"},
+                "metoo": {"type": "TYPE_STRING"},
+            },
+        },
+        id="optional_properties",
+    ),
+]
+
+
+def _assert_descriptor(descriptor, package, msg_name, expected):
+    """Shared assertion block for the parametrized shape cases"""
     # Validate message naming
     assert descriptor.name == msg_name
     assert descriptor.full_name == ".".join([package, msg_name])
 
     # Validate nested descriptors
-    assert len(descriptor.nested_types) == 2
-    nested_types = {typ.name: typ for typ in descriptor.nested_types}
-    assert list(nested_types.keys()) == ["SCREWDRIVER", "DRILL"]
-    assert not descriptor.enum_types
-    assert len(descriptor.oneofs) == 1
-    assert descriptor.oneofs[0].name == "bitType"
+    nested_types = nested_by_name(descriptor)
+    assert list(nested_types.keys()) == expected.get("nested", [])
+    for nested_name, nested in nested_types.items():
+        assert nested.full_name == ".".join([package, msg_name, nested_name])
+    for nested_name, nested_field_types in expected.get("nested_fields", {}).items():
+        assert {
+            field.name: field.type for field in nested_types[nested_name].fields
+        } == {
+            field_name: getattr(FieldDescriptor, type_name)
+            for field_name, type_name in nested_field_types.items()
+        }
+
+    # Validate nested enums
+    enum_types = {enum.name: enum for enum in descriptor.enum_types}
+    assert list(enum_types.keys()) == list(expected.get("enums", {}))
+    for enum_name, enum_values in expected.get("enums", {}).items():
+        enum_type = enum_types[enum_name]
+        assert enum_type.full_name == ".".join([package, msg_name, enum_name])
+        assert {
+            val_name: val.number for val_name, val in enum_type.values_by_name.items()
+        } == enum_values
+
+    # Validate oneofs
+    assert [oneof.name for oneof in descriptor.oneofs] == expected.get("oneofs", [])
 
     # Validate fields
-    fields = dict(descriptor.fields_by_name)
-    assert list(fields.keys()) == ["screw_driver", "drill"]
-    assert fields["screw_driver"].type == fields["screw_driver"].TYPE_MESSAGE
-    assert fields["screw_driver"].containing_oneof.name == "bitType"
-    assert fields["screw_driver"].label == fields["screw_driver"].LABEL_OPTIONAL
-    assert fields["drill"].type == fields["drill"].TYPE_MESSAGE
-    assert fields["screw_driver"].containing_oneof.name == "bitType"
-    assert fields["drill"].label == fields["drill"].LABEL_OPTIONAL
-
-
-def test_jtd_to_proto_optional_properties(temp_dpool):
-    """Ensure that entries in 'optionalProperties' are handled"""
+    fields = descriptor.fields_by_name
+    assert list(fields.keys()) == list(expected["fields"])
+    for field_name, field_spec in expected["fields"].items():
+        field = fields[field_name]
+        assert field.type == getattr(field, field_spec["type"])
+        assert field.label == getattr(field, field_spec.get("label", "LABEL_OPTIONAL"))
+        if "message_type" in field_spec:
+            assert field.message_type.full_name == field_spec["message_type"]
+        if "oneof" in field_spec:
+            assert field.containing_oneof.name == field_spec["oneof"]
+
+
+@pytest.mark.parametrize("msg_name,package,schema,expected", _DESCRIPTOR_CASES)
+def test_jtd_to_proto_shapes(temp_dpool, msg_name, package, schema, expected):
+    """Ensure that each JTD shape converts to the expected descriptors"""
+    descriptor = jtd_to_proto(
+        msg_name,
+        package,
+        schema,
+        descriptor_pool=temp_dpool,
+        validate_jtd=True,
+    )
+    _assert_descriptor(descriptor, package, msg_name, expected)
+
+
+def test_jtd_to_proto_additonal_properties(temp_dpool):
+    """Ensure that an object can use 'additionalProperties'"""
     msg_name = "Foo"
-    package = "foo.bar"
+    package = "foo.bar.additional_props"
     descriptor = jtd_to_proto(
         msg_name,
         package,
         {
             "properties": {
-                "foo": {
-                    "type": "boolean",
+                "buz": {
+                    "additionalProperties": True,
                 },
             },
-            "optionalProperties": {
-                "metoo": {
-                    "type": "string",
-                }
-            },
         },
         descriptor_pool=temp_dpool,
         validate_jtd=True,
@@ -543,27 +366,38 @@ def test_jtd_to_proto_optional_properties(temp_dpool):
     assert descriptor.full_name == ".".join([package, msg_name])
 
     # Validate nested descriptors
-    assert not descriptor.nested_types
+    nested_types = list(descriptor.nested_types)
+    assert len(nested_types) == 1
+    assert nested_types[0].name == "Buz"
+    assert nested_types[0].full_name == ".".join([package, msg_name, "Buz"])
+    nested_fields = nested_types[0].fields_by_name
+    assert list(nested_fields.keys()) == ["additionalProperties"]
+    assert (
+        nested_fields["additionalProperties"].type
+        == nested_fields["additionalProperties"].TYPE_MESSAGE
+    )
+    assert (
+        nested_fields["additionalProperties"].message_type.full_name
+        == "google.protobuf.Struct"
+    )
     assert not descriptor.enum_types
     assert not descriptor.oneofs
 
     # Validate fields
-    fields = dict(descriptor.fields_by_name)
-    assert list(fields.keys()) == ["foo", "metoo"]
-    assert fields["foo"].type == fields["foo"].TYPE_BOOL
-    assert fields["foo"].label == fields["foo"].LABEL_OPTIONAL
-    assert fields["metoo"].type == fields["metoo"].TYPE_STRING
-    assert fields["metoo"].label == fields["metoo"].LABEL_OPTIONAL
+    fields = descriptor.fields_by_name
+    assert list(fields.keys()) == ["buz"]
+    assert fields["buz"].type == fields["buz"].TYPE_MESSAGE
+    assert fields["buz"].label == fields["buz"].LABEL_OPTIONAL
 
 
 def test_jtd_to_proto_top_level_enum(temp_dpool):
     """Make sure that a top-level enum can be converted"""
     msg_name = "SomeEnum"
-    package = "foo.bar"
+    package = "foo.bar.top_level_enum"
     descriptor = jtd_to_proto(
         msg_name,
         package,
-        {"enum": ["FOO", "BAR"]},
+        _FOO_BAR_ENUM_SCHEMA,
         descriptor_pool=temp_dpool,
         validate_jtd=True,
     )
@@ -588,13 +422,13 @@ def test_jtd_to_proto_reference_external_descriptor(temp_dpool):
 
     nested_descriptor = jtd_to_proto(
         "Foo",
-        "foo.bar",
+        "foo.bar.ref_msg",
         {"properties": {"foo": {"type": "string"}}},
         descriptor_pool=temp_dpool,
     )
     wrapper_descriptor = jtd_to_proto(
         "Bar",
-        "foo.bar",
+        "foo.bar.ref_msg",
         {"properties": {"bar": {"type": nested_descriptor}}},
         descriptor_pool=temp_dpool,
     )
@@ -608,13 +442,13 @@ def test_jtd_to_proto_reference_external_enum_descriptor(temp_dpool):
 
     enum_descriptor = jtd_to_proto(
         "Foo",
-        "foo.bar",
-        {"enum": ["FOO", "BAR"]},
+        "foo.bar.ref_enum",
+        _FOO_BAR_ENUM_SCHEMA,
         descriptor_pool=temp_dpool,
     )
     wrapper_descriptor = jtd_to_proto(
         "Bar",
-        "foo.bar",
+        "foo.bar.ref_enum",
         {"properties": {"bar": {"type": enum_descriptor}}},
         descriptor_pool=temp_dpool,
     )
@@ -640,7 +474,6 @@ def test_jtd_to_proto_any(temp_dpool):
     """Make sure that fields can have type Any and that the messages can be
     validated even with any which is not in the JTD spec
     """
-    temp_dpool.AddSerializedFile(any_pb2.DESCRIPTOR.serialized_pb)
     bytes_descriptor = jtd_to_proto(
         "HasAny",
         "foo.bar",
@@ -690,13 +523,7 @@ def test_jtd_to_proto_default_dpool():
     jtd_to_proto(
         "Foo",
         "foo.bar",
-        {
-            "properties": {
-                "foo": {
-                    "type": "boolean",
-                },
-            }
-        },
+        _BOOL_PROPS_SCHEMA,
     )
 
     # Tacking on a `jtd_to_service` test here as well so that we don't have
@@ -722,14 +549,8 @@ def test_jtd_to_proto_default_dpool():
 def test_jtd_to_proto_duplicate_message(temp_dpool):
     """Check that we can register the same message twice"""
     msg_name = "Foo"
-    package = "foo.bar"
-    schema = {
-        "properties": {
-            "foo": {
-                "type": "boolean",
-            },
-        }
-    }
+    package = "foo.bar.duplicate"
+    schema = _BOOL_PROPS_SCHEMA
     descriptor = jtd_to_proto(
         msg_name,
         package,
@@ -757,6 +578,55 @@ def test_jtd_to_proto_invalid_def():
         jtd_to_proto("Foo", "foo.bar", {"foo": "bar"}, validate_jtd=True)
 
 
+def test_jtd_to_proto_invalid_def_cached_without_validation(temp_dpool):
+    """Make sure that a cached validate_jtd=False conversion does not let a
+    later validate_jtd=True call skip validation of an invalid schema
+    """
+    msg_name = "Foo"
+    package = "foo.bar.cached_no_validation"
+    schema = {
+        "properties": {
+            "foo": {
+                "type": "boolean",
+            },
+        },
+        "bogusKeyword": 123,
+    }
+    # The invalid keyword is ignored when not validating
+    jtd_to_proto(
+        msg_name,
+        package,
+        schema,
+        descriptor_pool=temp_dpool,
+    )
+    with pytest.raises(AttributeError):
+        jtd_to_proto(
+            msg_name,
+            package,
+            schema,
+            descriptor_pool=temp_dpool,
+            validate_jtd=True,
+        )
+
+
+def test_jtd_to_proto_unserializable_schema_value():
+    """Make sure that an error is raised if the schema holds a value that is
+    neither json-serializable nor a known descriptor reference
+    """
+    with pytest.raises(TypeError):
+        jtd_to_proto(
+            "Foo",
+            "foo.bar",
+            {
+                "properties": {
+                    "foo": {
+                        "type": {"widget", "sprocket"},
+                    },
+                },
+            },
+        )
+
+
 def test_jtd_to_proto_invalid_top_level():
     """Make sure that an error is raised if the top-level definition is a nested
     field specification
@@ -807,17 +677,11 @@ def test_jtd_to_proto_explicit_additional_properties():
 def test_jtd_to_proto_duplicate_message_name(temp_dpool):
     """Check that we cannot register a different message with the same name"""
     msg_name = "Foo"
-    package = "foo.bar"
+    package = "foo.bar.duplicate_name"
     jtd_to_proto(
         msg_name,
         package,
-        {
-            "properties": {
-                "foo": {
-                    "type": "boolean",
-                },
-            }
-        },
+        _BOOL_PROPS_SCHEMA,
         descriptor_pool=temp_dpool,
         validate_jtd=True,
     )
@@ -843,3 +707,23 @@ def test_jtd_to_proto_duplicate_message_name(temp_dpool):
 def test_to_upper_camel_empty():
     """Make sure _to_upper_camel is safe with an empty string"""
     assert _to_upper_camel("") == ""
+
+
+@pytest.mark.parametrize(
+    "snake_str,expected",
+    [
+        ("foo", "Foo"),
+        ("foo_bar", "FooBar"),
+        ("fooBar", "FooBar"),
+        ("SCREW_DRIVER", "SCREWDRIVER"),
+        # Underscores before digits and extra underscores in a run are kept
+        ("foo_1", "Foo_1"),
+        ("foo__bar", "Foo_Bar"),
+    ],
+)
+def test_to_upper_camel(snake_str, expected):
+    """Make sure _to_upper_camel preserves its established naming semantics.
+    These names feed descriptor full_names, so changing them breaks
+    re-registration against long-lived pools.
+    """
+    assert _to_upper_camel(snake_str) == expected